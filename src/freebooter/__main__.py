@@ -18,15 +18,15 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import atexit
 import os
 import sys
 import webbrowser
 from argparse import ArgumentParser
-from concurrent.futures import ThreadPoolExecutor, Future, Executor, CancelledError
+from copy import copy
+from concurrent.futures import ThreadPoolExecutor, Future, Executor, CancelledError, as_completed
 from functools import partial
 from importlib.util import find_spec
-from io import FileIO
 from logging import (
     basicConfig,
     DEBUG,
@@ -34,20 +34,20 @@ from logging import (
     getLogger,
     StreamHandler,
     ERROR,
+    LogRecord,
+    Formatter,
 )
+from logging.handlers import QueueHandler, QueueListener
 from os import environ
-from os.path import splitext
 from pathlib import Path
+from queue import SimpleQueue
 from threading import Event
-from typing import cast, Any
+from typing import Any, Sequence
 
 import yaml
-from dislog import DiscordWebhookHandler
-from google_auth_oauthlib.flow import Flow
-from jsonschema import validate, ValidationError
+from jsonschema import ValidationError
 from mariadb import ConnectionPool, Connection, PoolError, MAX_POOL_SIZE
 from oauthlib.oauth2 import OAuth2Token
-from pillow_heif import register_heif_opener
 from tweepy import OAuth1UserHandler
 
 from . import *
@@ -55,12 +55,90 @@ from ._assets import *
 from ._config import *
 from .util import (
     Loader,
+    json_loads,
+    json_dumps,
 )  # Using a loader that supports !include makes our config files much more readable.
 
 logger = getLogger(__name__)
 
-# Init helper libraries
-register_heif_opener()  # Enables Pillow to open HEIF files
+
+def _below_error(record: LogRecord, _error: int = ERROR) -> bool:
+    return record.levelno < _error
+
+
+class _DislogQueueHandler(QueueHandler):
+    """
+    A QueueHandler for dislog. The stock prepare() formats the record, which puts the whole traceback into the message
+    dislog makes its embed from. This keeps just the message, like dislog gets when it handles the record itself.
+    """
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        record = copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        return record
+
+
+def _effective_cpu_count() -> int:
+    """
+    Returns the number of CPUs this process may actually run on. Unlike os.cpu_count(), this respects CPU affinity,
+    which is how container runtimes usually pin a container to a subset of the host's cores.
+    """
+    if hasattr(os, "sched_getaffinity"):  # not on macOS or Windows
+        return len(os.sched_getaffinity(0))
+    else:
+        return os.cpu_count() or 1
+
+
+def _close_all(closeables: Sequence[Watcher | Middleware | Uploader]) -> None:
+    """
+    Closes everything in parallel, since closing mostly means waiting on a thread to finish its cycle or on the network.
+    AsyncioWatchers are the exception: their close() drives the main thread's event loop, so they are closed one at a
+    time on this thread while the others close in the background.
+    Raises the first exception (in order) that a close() raised, after all of them have finished.
+    """
+    parallel_closeables = [closeable for closeable in closeables if not isinstance(closeable, AsyncioWatcher)]
+
+    with ThreadPoolExecutor(
+        max_workers=min(32, len(parallel_closeables) or 1), thread_name_prefix="Shutdown"
+    ) as close_executor:
+        close_futures: dict[Watcher | Middleware | Uploader, Future[None]] = {
+            closeable: close_executor.submit(closeable.close) for closeable in parallel_closeables
+        }
+
+        loop_errors: dict[Watcher | Middleware | Uploader, Exception] = {}
+        for closeable in closeables:
+            if isinstance(closeable, AsyncioWatcher):
+                try:
+                    closeable.close()
+                except Exception as e:
+                    loop_errors[closeable] = e
+
+    for closeable in closeables:
+        if closeable in loop_errors:
+            raise loop_errors[closeable]
+        elif closeable in close_futures:
+            close_futures[closeable].result()
+        # else: an AsyncioWatcher that closed cleanly
+
+
+def _ensure_directory(env_var: str, default: str) -> Path:
+    """
+    Returns the absolute path of the directory named by the environment variable, creating it if it doesn't exist.
+    """
+    directory = Path(environ.get(env_var, default)).absolute()  # absolute() is a no-op for absolute paths
+
+    try:
+        directory.mkdir(parents=True)  # one syscall if it already exists, instead of a stat and then a mkdir
+    except FileExistsError:
+        pass
+    else:
+        logger.debug(f"Created folder {directory} for {env_var}")
+
+    return directory
 
 
 def authorize_youtube_data_api() -> None:
@@ -108,14 +186,10 @@ def authorize_youtube_data_api() -> None:
 
     print("Checking validity of client secret...")
 
-    with (ASSETS / "client-secret-schema.json").open("r") as schema_fp:
-        client_secret_schema = json.load(schema_fp)
-
-    with client_secret_path.open("r") as secret_fp:
-        client_secret = json.load(secret_fp)
+    client_secret = json_loads(client_secret_path.read_bytes())
 
     try:
-        validate(instance=client_secret, schema=client_secret_schema)
+        load_asset_validator(CLIENT_SECRET_SCHEMA_ASSET)(client_secret)
     except ValidationError as e:
         print(f"Client secret {client_secret_path} is not valid: {e}")
         sys.exit(1)
@@ -127,6 +201,9 @@ def authorize_youtube_data_api() -> None:
     print("Starting OAuth2 authorization flow.")
     print(f"Found client secret file {client_secret_path}, attempting to authorize.")
 
+    # Only the authorization entrypoint needs google_auth_oauthlib, so keep it out of the import path of main()
+    from google_auth_oauthlib.flow import Flow
+
     flow = Flow.from_client_secrets_file(
         str(client_secret_path),
         scopes=[YOUTUBE_UPLOAD_SCOPE],
@@ -148,8 +225,7 @@ def authorize_youtube_data_api() -> None:
 
     # Save the credentials for production later
 
-    with oauth2_token_path.open("w") as fp:
-        json.dump(token, fp)
+    oauth2_token_path.write_bytes(json_dumps(token))
 
     print(f"Saved OAuth2 token to {oauth2_token_path}.")
     return
@@ -197,6 +273,12 @@ def main() -> None:
     # note: I would *love* to do this all with asyncio, but since literally EVERY SINGLE LIBRARY is blocking, it's only
     # going to be possible with a shitload of asyncio.to_thread calls or with threads, which is what I did here.
 
+    # Nothing else in the package uses pillow_heif, so only the daemon loads it
+    from pillow_heif import register_heif_opener
+
+    # Init helper libraries
+    register_heif_opener()  # Enables Pillow to open HEIF files
+
     # Asyncio stuff - for d.py & future use
     loop = asyncio.new_event_loop()
 
@@ -211,14 +293,26 @@ def main() -> None:
         standard_handler: StreamHandler = StreamHandler(sys.stdout)
         error_handler: StreamHandler = StreamHandler(sys.stderr)
 
-        standard_handler.addFilter(lambda record: record.levelno < ERROR)  # keep errors to stderr
+        standard_handler.addFilter(_below_error)  # keep errors to stderr
         error_handler.setLevel(ERROR)
 
+        stream_formatter = Formatter("%(asctime)s\t%(levelname)s\t%(name)s@%(threadName)s: %(message)s")
+        standard_handler.setFormatter(stream_formatter)
+        error_handler.setFormatter(stream_formatter)
+
+        # Writing to the streams takes each handler's lock, which would serialize every thread that logs. Have the
+        # threads enqueue their records instead, and let a single listener thread do the filtering and the writing.
+        stream_listener = QueueListener(SimpleQueue(), standard_handler, error_handler, respect_handler_level=True)
+        stream_queue_handler = QueueHandler(stream_listener.queue)
+        stream_queue_handler.setFormatter(Formatter("%(message)s"))  # the stream handlers add the rest
+
         basicConfig(
-            format="%(asctime)s\t%(levelname)s\t%(name)s@%(threadName)s: %(message)s",
             level=DEBUG if __debug__ else INFO,
-            handlers=[standard_handler, error_handler],
+            handlers=[stream_queue_handler],
         )
+        stream_listener.start()
+        # At exit rather than at the end of main(), so the records from an early sys.exit() or a crash still get out
+        atexit.register(stream_listener.stop)
 
     # dislog
 
@@ -227,15 +321,31 @@ def main() -> None:
     if dislog_url is not None:
         logger.info("Discord Webhook provided, enabling Discord logging.")
 
+        from discord import SyncWebhook
+        from dislog import DiscordWebhookHandler
+        from requests import Session
+
         dislog_message: str | None = environ.get("FREEBOOTER_DISCORD_WEBHOOK_MESSAGE")
 
+        # Given just the URL, dislog's SyncWebhook has no session, so every record would open a new TLS connection.
+        # One long-lived session keeps the connection to Discord alive between records.
+        dislog_webhook = SyncWebhook.from_url(dislog_url, session=Session())
+
         handler = DiscordWebhookHandler(
-            dislog_url,
+            dislog_webhook,
             level=INFO,  # debug is just too much for discord to handle
             text_send_on_error=dislog_message,
             run_async=False,  # can't do async with the current nature of the program with sync code still used
         )
-        getLogger().addHandler(handler)
+
+        # dislog builds a discord Embed for every record in emit(), which would otherwise happen on whatever thread
+        # logged. Hand records off through a queue so only the listener thread pays for it.
+        dislog_listener = QueueListener(SimpleQueue(), handler, respect_handler_level=True)
+        dislog_queue_handler = _DislogQueueHandler(dislog_listener.queue)
+        dislog_queue_handler.setLevel(handler.level)
+        getLogger().addHandler(dislog_queue_handler)
+        dislog_listener.start()
+        atexit.register(dislog_listener.stop)  # runs before the console listener's, since atexit goes in reverse
 
     logger.debug("Logging configured successfully.")
 
@@ -243,23 +353,8 @@ def main() -> None:
 
     logger.debug("Setting up scratch folder and config folder...")
 
-    scratch_folder = Path(environ.get("FREEBOOTER_SCRATCH", "scratch"))
-
-    if not scratch_folder.is_absolute():
-        scratch_folder = scratch_folder.absolute()
-
-    if not scratch_folder.exists():
-        scratch_folder.mkdir(parents=True)
-        logger.debug(f"Created scratch folder in {scratch_folder}")
-
-    config_folder = Path(environ.get("FREEBOOTER_CONFIG", "config"))
-
-    if not config_folder.is_absolute():
-        config_folder = config_folder.absolute()
-
-    if not config_folder.exists():
-        config_folder.mkdir(parents=True)
-        logger.debug(f"Created config folder in {config_folder}")
+    scratch_folder = _ensure_directory("FREEBOOTER_SCRATCH", "scratch")
+    config_folder = _ensure_directory("FREEBOOTER_CONFIG", "config")
 
     file_manager = FileManager(scratch_folder)
 
@@ -282,23 +377,23 @@ def main() -> None:
 
         config_data: Any
 
-        with FileIO(config_path, "r") as config_file:
-            config_file_name: Path = cast("Path", config_file.name)
-            file_extension = splitext(config_file_name)[1]
-            if file_extension == ".yml" or file_extension == ".yaml":
+        if config_path.suffix in (".yml", ".yaml"):
+            # A buffered file rather than the bytes, since the Loader resolves !include paths from the file's name
+            with open(config_path, "rb") as config_file:
                 config_data = yaml.load(config_file, Loader)
-            else:
-                config_data = json.load(config_file)
+        else:
+            config_data = json_loads(config_path.read_bytes())  # orjson, if it's installed
 
         configuration = LegacyYamlConfiguration(config_data)
     else:
         logger.error("No configuration file provided.")
         sys.exit(1)
 
-    # Now we start opening connections and running our code:
+    watchers: Sequence[Watcher] = configuration.watchers()
+    uploaders: Sequence[Uploader] = configuration.uploaders()
+    middlewares: Sequence[Middleware] = configuration.middlewares()
 
-    # This is copied from threading.futures.ThreadPoolExecutor
-    max_workers = min(32, (os.cpu_count() or 1) + 4)
+    # Now we start opening connections and running our code:
 
     # MariaDB startup
 
@@ -316,19 +411,35 @@ def main() -> None:
         "user": db_user,
         "database": db_database,
         "password": db_password,
+        # Watchers only ever run single statements, so autocommit keeps a pooled connection from holding on to a
+        # stale REPEATABLE READ snapshot between cycles.
+        "autocommit": True,
     }
 
+    # Only the watchers check out connections, one at a time each, so the pool is sized from how many there are rather
+    # than from the CPU count. get_connection will still make more past this if it has to.
+    if "FREEBOOTER_MYSQL_POOL_SIZE" in environ:
+        pool_size = int(environ["FREEBOOTER_MYSQL_POOL_SIZE"])
+    else:
+        pool_size = len(watchers) + 2  # a little headroom for overlapping checkouts
+    pool_size = min(max(pool_size, 5), MAX_POOL_SIZE)
+
     logger.debug("MariaDB configuration loaded.")
 
     pool = ConnectionPool(
         pool_name="freebooter",
-        pool_size=min(max(max_workers, 5), MAX_POOL_SIZE),
+        pool_size=pool_size,
+        # With autocommit on there is no session state worth resetting, so skip the round trip on every release.
+        pool_reset_connection=False,
         **mariadb_connection_kwargs,
     )
 
     # Override the get_connection method to make new connections if one doesn't exist
 
     default_get_connection = pool.get_connection
+    add_connection = pool.add_connection
+    # The pool strips its own arguments out of these, and they don't change after it's made
+    connection_args: dict[str, Any] = getattr(pool, "_conn_args", mariadb_connection_kwargs)
 
     def get_connection() -> Connection:
         """
@@ -344,15 +455,10 @@ def main() -> None:
         if existing_connection is not None:
             return existing_connection
 
-        if hasattr(pool, "_conn_args"):
-            connection_args = pool._conn_args
-        else:
-            connection_args = mariadb_connection_kwargs
-
         new_connection = Connection(**connection_args)
 
         try:
-            pool.add_connection(new_connection)
+            add_connection(new_connection)
         except PoolError:
             pass  # This connection will have to exist outside the pool.
 
@@ -368,28 +474,35 @@ def main() -> None:
     def upload_handler(
         medias: list[tuple[ScratchFile, MediaMetadata | None]]
     ) -> list[tuple[ScratchFile, MediaMetadata | None]]:
+        if not medias:
+            return medias  # an idle check cycle, there is nothing to run anything on
+
         logger.debug(f"Running middlewares on {len(medias)} files...")
 
-        for middleware in configuration.middlewares():
+        for middleware in middlewares:
             medias = middleware.process_many(medias)
 
+        if not medias:
+            logger.debug("Middlewares left no files to upload.")
+            return medias
+
         logger.debug(f"Middlewares were processed. Running uploaders on {len(medias)} files...")
 
         out_medias: list[tuple[ScratchFile, MediaMetadata | None]] = []
 
-        with ThreadPoolExecutor() as upload_executor:
-            uploader_futures: list[Future[list[tuple[ScratchFile, MediaMetadata | None]]]] = []
-            for uploader in configuration.uploaders():
-                uploader_futures.append(upload_executor.submit(uploader.upload_and_preprocess, medias))
-            for future in uploader_futures:
-                try:
-                    out_medias.extend(future.result())
-                except Exception as e:
-                    if not isinstance(e, (CancelledError, TimeoutError)):
-                        logger.exception(f"Error while running uploader: {e}")
-                        continue
-                    else:
-                        raise
+        uploader_futures: list[Future[list[tuple[ScratchFile, MediaMetadata | None]]]] = []
+        for uploader in uploaders:
+            uploader_futures.append(upload_executor.submit(uploader.upload_and_preprocess, medias))
+        # Collect in completion order so a slow uploader doesn't hold up logging the failures of the others
+        for future in as_completed(uploader_futures):
+            try:
+                out_medias.extend(future.result())
+            except Exception as e:
+                if not isinstance(e, (CancelledError, TimeoutError)):
+                    logger.exception(f"Error while running uploader: {e}")
+                    continue
+                else:
+                    raise
 
         logger.debug(f"Uploaders were processed. Returning {len(out_medias)} files...")
 
@@ -413,15 +526,24 @@ def main() -> None:
             else:
                 logger.debug("Upload was completed. Closing files...")
                 for scratch_file, _ in result:
-                    if not scratch_file.closed:
-                        scratch_file.close()
+                    scratch_file.close()  # idempotent, and cheaper than checking .closed, which stats the file
 
         fut = executor.submit(upload_handler, medias)
         fut.add_done_callback(_cleanup_callback)
 
         return fut
 
-    with ThreadPoolExecutor(thread_name_prefix="Uploader") as callback_executor:
+    # Each callback fans out to every uploader, and uploaders of the same type serialize on their class' glock, so the
+    # number of uploads that can usefully be in flight scales with the number of uploaders rather than the CPU count.
+    uploader_count = len(uploaders)
+    callback_workers = max(4, min(32, uploader_count * 2))
+
+    # The fan-out to the uploaders reuses one pool for every batch instead of spinning up threads each time. It is shut
+    # down after the callback executor, so a batch that is still running can always submit to it.
+    upload_executor = ThreadPoolExecutor(max_workers=callback_workers, thread_name_prefix="UploadFan")
+    callback_executor = ThreadPoolExecutor(max_workers=callback_workers, thread_name_prefix="Uploader")
+
+    with upload_executor, callback_executor:
         # Preparing
         prepare_kwargs = {
             "shutdown_event": shutdown_event,
@@ -432,30 +554,33 @@ def main() -> None:
             "event_loop": loop,
         }
 
-        with ThreadPoolExecutor(thread_name_prefix="Setup") as setup_executor:
+        # Same as ThreadPoolExecutor's default, but from the CPUs we can run on rather than the ones the host has
+        setup_workers = min(32, _effective_cpu_count() + 4)
+
+        with ThreadPoolExecutor(max_workers=setup_workers, thread_name_prefix="Setup") as setup_executor:
             logger.debug("Preparing...")
-            setup_futures: list[tuple[Uploader | Middleware | Watcher, Future[None]]] = []
-            for uploader in configuration.uploaders():
-                future = setup_executor.submit(uploader.prepare, **prepare_kwargs)
-                setup_futures.append((uploader, future))
-            for middleware in configuration.middlewares():
-                future = setup_executor.submit(middleware.prepare, **prepare_kwargs)
-                setup_futures.append((middleware, future))
-            for watcher in configuration.watchers():
-                future = setup_executor.submit(watcher.prepare, **prepare_kwargs)
-                setup_futures.append((watcher, future))
-            for item, future in setup_futures:
+            setup_futures: dict[Future[None], Uploader | Middleware | Watcher] = {}
+            for uploader in uploaders:
+                setup_futures[setup_executor.submit(uploader.prepare, **prepare_kwargs)] = uploader
+            for middleware in middlewares:
+                setup_futures[setup_executor.submit(middleware.prepare, **prepare_kwargs)] = middleware
+            for watcher in watchers:
+                setup_futures[setup_executor.submit(watcher.prepare, **prepare_kwargs)] = watcher
+            # Collect in completion order so a failure is raised as soon as it happens, not after every slower prepare
+            for future in as_completed(setup_futures):
                 try:
                     future.result()
                 except Exception as e:
                     if not isinstance(e, (CancelledError, TimeoutError)):
-                        logger.exception(f"Error while preparing {item}: {e}")
+                        logger.exception(f"Error while preparing {setup_futures[future]}: {e}")
+                    for other_future in setup_futures:
+                        other_future.cancel()  # don't start preparing anything else, we're going down anyway
                     raise
             logger.debug("Done.")
 
         # Start watchers
         logger.debug("Starting watcher threads...")
-        for watcher in configuration.watchers():
+        for watcher in watchers:
             if isinstance(watcher, ThreadWatcher):
                 watcher.start()
         logger.debug("Done.")
@@ -470,20 +595,17 @@ def main() -> None:
             shutdown_event.set()
 
         logger.debug("Closing watchers...")
-        for watcher in configuration.watchers():
-            watcher.close()
+        _close_all(watchers)
         logger.debug("Done.")
 
     # Wait until after the executor shutdown is set to close the middlewares and uploaders as they may still be needed
 
     logger.debug("Closing middlewares...")
-    for middleware in configuration.middlewares():
-        middleware.close()
+    _close_all(middlewares)
     logger.debug("Done.")
 
     logger.debug("Closing uploaders...")
-    for uploader in configuration.uploaders():
-        uploader.close()
+    _close_all(uploaders)
     logger.debug("Done.")
 
     logger.debug("Closing MariaDB connection pool...")
@@ -17,13 +17,45 @@
 """
 from __future__ import annotations
 
+from functools import lru_cache
 from importlib.resources import files
+from typing import Any
+
+from .util import json_loads, compile_schema, SchemaValidator
 
 PACKAGE_ROOT = files("freebooter")
 
 ASSETS = PACKAGE_ROOT / "assets"
 
+# File names in the assets folder, for load_json_asset and load_asset_validator
+CONFIG_SCHEMA_ASSET = "config-schema.json"
+CLIENT_SECRET_SCHEMA_ASSET = "client-secret-schema.json"
+DEVICES_ASSET = "devices3.json"
+
+
+@lru_cache(maxsize=None)
+def load_json_asset(asset_name: str) -> Any:
+    """
+    Reads and decodes a JSON file from the assets folder, like one of the *_ASSET constants.
+    The decoded result is cached and shared between callers, so it must not be mutated.
+    """
+    return json_loads((ASSETS / asset_name).read_bytes())
+
+
+@lru_cache(maxsize=None)
+def load_asset_validator(asset_name: str) -> SchemaValidator:
+    """
+    Compiles the JSON schema in the assets folder into a validator, once per schema.
+    """
+    return compile_schema(load_json_asset(asset_name))
+
+
 __all__ = (
     "PACKAGE_ROOT",
     "ASSETS",
+    "CONFIG_SCHEMA_ASSET",
+    "CLIENT_SECRET_SCHEMA_ASSET",
+    "DEVICES_ASSET",
+    "load_json_asset",
+    "load_asset_validator",
 )
@@ -17,12 +17,11 @@
 """
 from __future__ import annotations
 
-import json
-from typing import Any, Type, Mapping, Generator
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Type, Mapping, Sequence
 
-import jsonschema
-
-from ._assets import ASSETS
+from ._assets import CONFIG_SCHEMA_ASSET, load_asset_validator
 from .config import Configuration
 from .middlewares import (
     Middleware,
@@ -52,17 +51,13 @@ from .watchers import (
     SelfcordWatcher,
 )
 
-CONFIG_SCHEMA_TRAVERSABLE = ASSETS / "config-schema.json"
-
-with CONFIG_SCHEMA_TRAVERSABLE.open(mode="r") as fp:
-    CONFIG_SCHEMA = json.load(fp)
-
 
 def check_config(config: dict[str, Any]) -> None:
     """
     Checks if the config is valid.
+    :raises jsonschema.ValidationError: If it isn't.
     """
-    jsonschema.validate(config, CONFIG_SCHEMA)
+    load_asset_validator(CONFIG_SCHEMA_ASSET)(config)
 
 
 MIDDLEWARES: Mapping[str, Type[Middleware]] = FrozenDict(
@@ -103,9 +98,9 @@ class LegacyYamlConfiguration(Configuration):
     """
     A concrete implementation of the Configuration interface.
     """
-    watcher_map: dict[str, Type[Watcher]]
-    uploader_map: dict[str, Type[Uploader]]
-    middleware_map: dict[str, Type[Middleware]]
+    watcher_map: Mapping[str, Type[Watcher]]
+    uploader_map: Mapping[str, Type[Uploader]]
+    middleware_map: Mapping[str, Type[Middleware]]
 
     watcher_cache: dict[str, Watcher]
     uploader_cache: dict[str, Uploader]
@@ -116,13 +111,31 @@ class LegacyYamlConfiguration(Configuration):
         self._config = config
         check_config(config)
 
-        self.watcher_map = dict(WATCHERS)
-        self.uploader_map = dict(UPLOADERS)
-        self.middleware_map = dict(MIDDLEWARES)
+        # The registries are immutable, so every instance can share them instead of holding its own copy
+        self.watcher_map = WATCHERS
+        self.uploader_map = UPLOADERS
+        self.middleware_map = MIDDLEWARES
 
         self.watcher_cache = {}
         self.uploader_cache = {}
         self.middleware_cache = {}
+        self._cache_lock = Lock()  # the caches are filled from the construction threads below
+
+        # The config can't change after this, so build everything in one pass instead of on every iteration
+        self._middlewares: list[Middleware] = [
+            self._middleware_of(middleware) for middleware in self._config["middlewares"]
+        ]
+
+        # Watchers and uploaders may do network I/O when constructed (OAuth clients, API discovery, sessions),
+        # so they are built concurrently. map() keeps the configured order and re-raises the first error.
+        watcher_data: list[dict[str, Any]] = self._config["watchers"]
+        uploader_data: list[dict[str, Any]] = self._config["uploaders"]
+        construction_workers = min(32, len(watcher_data) + len(uploader_data)) or 1
+        with ThreadPoolExecutor(max_workers=construction_workers, thread_name_prefix="Config") as config_executor:
+            watchers = config_executor.map(self._watcher_of, watcher_data)
+            uploaders = config_executor.map(self._uploader_of, uploader_data)
+            self._watchers: list[Watcher] = list(watchers)
+            self._uploaders: list[Uploader] = list(uploaders)
 
     def _middleware_of(self, middleware_data: dict[str, Any], *, prepend_name: str = "") -> Middleware:
         middleware_cls: Type[Middleware] = self.middleware_map[middleware_data["type"]]
@@ -132,12 +145,13 @@ class LegacyYamlConfiguration(Configuration):
         else:
             name = middleware_data["name"]
 
-        if name in self.middleware_cache:
-            return self.middleware_cache[name]
+        with self._cache_lock:  # middlewares are cheap to build, so they are built under the lock
+            if name in self.middleware_cache:
+                return self.middleware_cache[name]
 
-        middleware = middleware_cls(name, **middleware_data["config"])
+            middleware = middleware_cls(name, **middleware_data["config"])
 
-        self.middleware_cache[name] = middleware
+            self.middleware_cache[name] = middleware
 
         return middleware
 
@@ -146,8 +160,9 @@ class LegacyYamlConfiguration(Configuration):
 
         name = uploader_data["name"]
 
-        if name in self.uploader_cache:
-            return self.uploader_cache[name]
+        with self._cache_lock:
+            if name in self.uploader_cache:
+                return self.uploader_cache[name]
 
         preprocessors = [
             self._middleware_of(middleware, prepend_name=name) for middleware in uploader_data["preprocessors"]
@@ -155,17 +170,18 @@ class LegacyYamlConfiguration(Configuration):
 
         uploader = uploader_cls(name, preprocessors, **uploader_data["config"])
 
-        self.uploader_cache[name] = uploader
-
-        return uploader
+        with self._cache_lock:
+            # If the same name is configured twice, the first one to finish is the one everyone gets
+            return self.uploader_cache.setdefault(name, uploader)
 
     def _watcher_of(self, watcher_data: dict[str, Any]) -> Watcher:
         watcher_cls: Type[Watcher] = self.watcher_map[watcher_data["type"]]
 
         name = watcher_data["name"]
 
-        if name in self.watcher_cache:
-            return self.watcher_cache[name]
+        with self._cache_lock:
+            if name in self.watcher_cache:
+                return self.watcher_cache[name]
 
         preprocessors = [
             self._middleware_of(middleware, prepend_name=name) for middleware in watcher_data["preprocessors"]
@@ -173,21 +189,18 @@ class LegacyYamlConfiguration(Configuration):
 
         watcher = watcher_cls(name, preprocessors, **watcher_data["config"])
 
-        self.watcher_cache[name] = watcher
-
-        return watcher
+        with self._cache_lock:
+            # If the same name is configured twice, the first one to finish is the one everyone gets
+            return self.watcher_cache.setdefault(name, watcher)
 
-    def watchers(self) -> Generator[Watcher, None, None]:
-        for watcher in self._config["watchers"]:
-            yield self._watcher_of(watcher)
+    def watchers(self) -> Sequence[Watcher]:
+        return self._watchers
 
-    def uploaders(self) -> Generator[Uploader, None, None]:
-        for uploader in self._config["uploaders"]:
-            yield self._uploader_of(uploader)
+    def uploaders(self) -> Sequence[Uploader]:
+        return self._uploaders
 
-    def middlewares(self) -> Generator[Middleware, None, None]:
-        for middleware in self._config["middlewares"]:
-            yield self._middleware_of(middleware)
+    def middlewares(self) -> Sequence[Middleware]:
+        return self._middlewares
 
 
 __all__ = ("LegacyYamlConfiguration",)
@@ -19,7 +19,7 @@ from __future__ import annotations
 
 from abc import ABCMeta
 from os import environ
-from typing import Generator, ClassVar
+from typing import ClassVar, Sequence
 
 from tor_python_easy.tor_control_port_client import TorControlPortClient
 
@@ -113,21 +113,21 @@ class Configuration(metaclass=ABCMeta):
 
     # End tor stuff
 
-    def watchers(self) -> Generator[Watcher, None, None]:
+    def watchers(self) -> Sequence[Watcher]:
         """
-        Returns a generator of watchers.
+        Returns the watchers, in the order they were configured.
         """
         raise NotImplementedError
 
-    def middlewares(self) -> Generator[Middleware, None, None]:
+    def middlewares(self) -> Sequence[Middleware]:
         """
-        Returns a generator of middlewares.
+        Returns the middlewares, in the order they were configured.
         """
         raise NotImplementedError
 
-    def uploaders(self) -> Generator[Uploader, None, None]:
+    def uploaders(self) -> Sequence[Uploader]:
         """
-        Returns a generator of uploaders.
+        Returns the uploaders, in the order they were configured.
         """
         raise NotImplementedError
 
@@ -17,14 +17,12 @@
 """
 from __future__ import annotations
 
+import os
 import warnings
-from io import FileIO
 from logging import getLogger
 from pathlib import Path
-from random import choice
-from string import ascii_letters
 from threading import Lock
-from typing import Literal, TYPE_CHECKING
+from typing import Literal, TYPE_CHECKING, BinaryIO, cast
 
 from .util import WeakList
 
@@ -35,6 +33,8 @@ if TYPE_CHECKING:
 else:
     FILE_IO_MODE = str
 
+DEFAULT_SCRATCH_BUFFER_SIZE = 1 << 20  # 1 MiB
+
 
 class ScratchFile:
     def __init__(
@@ -51,7 +51,9 @@ class ScratchFile:
 
         self._closing_lock = Lock()  # to prevent a deadlock since the code is hacky for closing this
 
-        self._file: FileIO | None = None
+        self._file: BinaryIO | None = None
+        self._mode: FILE_IO_MODE | None = None
+        self._closed = False
 
     def __repr__(self) -> str:
         return f"ScratchFile({self._path})"
@@ -67,23 +69,40 @@ class ScratchFile:
     def path(self) -> Path:
         return self._path
 
-    def _get_file(self, mode: FILE_IO_MODE = "w+") -> FileIO:
-        fileio = FileIO(self._path, mode)
+    def materialize(self) -> None:
+        """
+        Writes the initial bytes to disk in one go, if there are any left to write.
+        After this, the file is a normal file on disk; opening it in a truncating mode ("w", "w+") will clear it.
+        """
+        if self._bytes is not None:
+            self._path.write_bytes(self._bytes)
+            self._bytes = None
+
+    def _get_file(self, mode: FILE_IO_MODE = "w+", buffering: int = DEFAULT_SCRATCH_BUFFER_SIZE) -> BinaryIO:
+        file = cast(BinaryIO, open(self._path, mode + "b", buffering=buffering))
         if self._bytes is not None:
-            fileio.write(self._bytes)
-        fileio.seek(0)
-        return fileio
+            file.write(self._bytes)
+        file.seek(0)
+        return file
 
-    def open(self, mode: FILE_IO_MODE = "r+") -> FileIO:
+    def open(self, mode: FILE_IO_MODE = "r+", buffering: int | None = None) -> BinaryIO:
         """
-        Opens the file and returns a FileIO object. You shouldn't open this file yourself, as the ScratchFile takes care of the lifecycle.
+        Opens the file in binary mode and returns it. You shouldn't open this file yourself, as the ScratchFile takes care of the lifecycle.
+        :param mode: The mode to open the file in, without the "b".
+        :param buffering: The size of the buffer used for reads & writes. By default, modes that can write are
+        unbuffered, so everything written is on disk at .path straight away for things like ffmpeg or the uploaders
+        that read the path. Read-only mode gets a 1 MiB buffer, since scratch files are usually multi-megabyte media.
+        If you pass a buffer size for a mode that writes, flush the file before handing out .path.
         :return:
         """
+        if buffering is None:
+            buffering = DEFAULT_SCRATCH_BUFFER_SIZE if mode == "r" else 0
         if self._file is None or self._file.closed:
-            self._file = self._get_file(mode)
-        elif self._file.mode != mode:
+            self._file = self._get_file(mode, buffering)
+        elif self._mode != mode:
             self._file.close()
-            self._file = self._get_file(mode)
+            self._file = self._get_file(mode, buffering)
+        self._mode = mode
         return self._file
 
     def __enter__(self) -> ScratchFile:
@@ -96,10 +115,15 @@ class ScratchFile:
 
     @property
     def closed(self) -> bool:
+        if self._closed:
+            return True  # no need to stat the path
         return not self._path.exists() and (self._file is None or self._file.closed)
 
     def close(self) -> None:
         with self._closing_lock:
+            if self._closed:
+                return  # Already cleaned up, don't touch the file manager or the disk again
+
             # ScratchFile would be a context manager, but it's not possible to use it as one because
             # it's not guaranteed to be used in a thread-safe manner.
 
@@ -111,8 +135,11 @@ class ScratchFile:
             if self._file is not None:
                 self._file.close()
             if self._delete:
+                # This can't be skipped when we never opened the file, since things like YoutubeDL write to the path
                 self._path.unlink(missing_ok=True)
 
+            self._closed = True
+
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
         self.close()
 
@@ -121,8 +148,7 @@ class FileManager:
     def __init__(self, directory: Path) -> None:
         self._directory = directory
 
-        if not self._directory.exists():
-            self._directory.mkdir()
+        self._directory.mkdir(exist_ok=True)
 
         self._files: WeakList = WeakList()
 
@@ -136,7 +162,9 @@ class FileManager:
 
     def close(self) -> None:
         assert not self.closed, "Close was called more than once!"
-        for file in self._files.copy():  # changes in size
+        with self._lock:
+            files = list(self._files)  # WeakList.copy() would return a plain, empty list
+        for file in files:  # changes in size
             file.close()
         for file in self.directory.iterdir():
             logger.debug(f"Deleting file {file} because it was not deleted automatically!")
@@ -154,7 +182,7 @@ class FileManager:
 
     @staticmethod
     def get_file_ident() -> str:
-        return "".join(choice(ascii_letters) for _ in range(15))
+        return os.urandom(8).hex()  # one call into C instead of 15 random.choice calls
 
     def get_file(
         self,
@@ -165,45 +193,38 @@ class FileManager:
     ) -> ScratchFile:
         """
         Returns an empty ScratchFile object with a random name and the given file extension.
-        This class is thread-safe.
+        This method is thread-safe: generated names are unique without coordination, and the lock is only held to
+        track the new ScratchFile.
         :param file_extension: A file extension to use for the file.
-        :param initial_bytes: Bytes that will be in the file when it is created. If unspecified, the file will be empty when opened.
+        :param initial_bytes: Bytes that will be written to the file immediately. If unspecified, the file will be empty when opened.
         :param file_name: The name of the file. If unspecified, a random name will be used.
         :return: A ScratchFile object. That can be used.
+        :raises ValueError: If neither a file name nor a valid file extension is given.
         """
-        with self._lock:
-            file_name_chosen: bool = file_name is not None
-
-            if file_name is None:
-                assert file_extension is not None, "File extension must be specified"
-                assert (file_extension.startswith(".") and not file_extension.endswith(".")) or len(
-                    file_extension
-                ) == 0, "File extension must start with a period"
-                file_name = self.get_file_ident() + file_extension
-
-            file_name = Path(file_name) if not isinstance(file_name, Path) else file_name
-
-            if not file_name.is_absolute():
-                file_name = self._directory / file_name
-
-            assert file_name is not None, "Could not find a file name!"
-
-            logger.debug(f"Allocating ScratchFile at {file_name}")
-
-            if file_name.exists() and not file_name_chosen:
-                # If a ScratchFile is allocated but doesn't exist, it will cause unexpected behavior.
-                # If it has a name chosen, then it is expected that something like YoutubeDL has already written to it,
-                #   and it is safe to use.
-                return self.get_file(
-                    file_extension=file_extension,
-                    initial_bytes=initial_bytes,
-                    file_name=None,
-                )
-                # Handing over a file that exists could result in unexpected behavior.
-            else:
-                scratch_file = ScratchFile(self, file_name, initial_bytes)  # Good to go!
-                self._files.append(scratch_file)
-                return scratch_file
+        if file_name is None:
+            # These are raised explicitly rather than asserted so that they still apply under python -O
+            if file_extension is None:
+                raise ValueError("Either a file extension or a file name must be specified")
+            if file_extension and (not file_extension.startswith(".") or file_extension.endswith(".")):
+                raise ValueError(f"File extension {file_extension!r} must start with a period")
+
+            # 64 random bits make a collision practically impossible, so there is no need to stat for one.
+            file_name = self.get_file_ident() + file_extension
+
+        file_name = Path(file_name) if not isinstance(file_name, Path) else file_name
+
+        if not file_name.is_absolute():
+            file_name = self._directory / file_name
+
+        logger.debug(f"Allocating ScratchFile at {file_name}")
+
+        # If a name was chosen, it is expected that something like YoutubeDL has already written to it.
+        scratch_file = ScratchFile(self, file_name, initial_bytes)
+        if initial_bytes is not None:
+            scratch_file.materialize()  # so it can be handed to libraries by path, too
+        with self._lock:  # WeakList isn't thread-safe, but nothing else here needs the lock
+            self._files.append(scratch_file)
+        return scratch_file
 
 
 __all__ = ("FileManager", "ScratchFile")
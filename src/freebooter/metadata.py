@@ -18,12 +18,15 @@
 from __future__ import annotations
 
 import mimetypes
+import re
+from dataclasses import dataclass
 from enum import Enum, auto
 from logging import getLogger
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Literal, TYPE_CHECKING
 
-import tweepy.models
+if TYPE_CHECKING:
+    import tweepy.models
 
 logger = getLogger(__name__)
 
@@ -42,16 +45,20 @@ class Platform(Enum):
 
     @classmethod
     def from_url(cls, url: str) -> Platform:
-        if "youtube.com" in url:
-            return cls.YOUTUBE
-        elif "tiktok.com" in url:
-            return cls.TIKTOK
-        elif "instagram.com" in url:
-            return cls.INSTAGRAM
-        elif "reddit.com" in url:
-            return cls.REDDIT
-        else:
+        match = _PLATFORM_DOMAIN_PATTERN.search(url)
+        if match is None:
             raise ValueError("Unknown platform")
+        return _PLATFORM_DOMAINS[match.group(0)]
+
+
+# These can't live on Platform, since the Enum would turn them into members
+_PLATFORM_DOMAINS: dict[str, Platform] = {
+    "youtube.com": Platform.YOUTUBE,
+    "tiktok.com": Platform.TIKTOK,
+    "instagram.com": Platform.INSTAGRAM,
+    "reddit.com": Platform.REDDIT,
+}
+_PLATFORM_DOMAIN_PATTERN = re.compile("|".join(re.escape(domain) for domain in _PLATFORM_DOMAINS))
 
 
 class MediaType(Enum):
@@ -123,17 +130,21 @@ class MediaType(Enum):
                 return cls.from_file_path(file)
 
 
+@dataclass(slots=True, frozen=True, init=False, repr=False, eq=False)
 class MediaMetadata:
-    __slots__ = (
-        "_id",
-        "_platform",
-        "_title",
-        "_description",
-        "_tags",
-        "_categories",
-        "_data",
-        "_type",
-    )
+    """
+    Immutable metadata about a piece of media.
+    data can be any data from the source platform that you want to keep track of. It is capable of being JSON serialized.
+    """
+
+    id: Any
+    platform: Platform
+    title: str | None
+    description: str | None
+    tags: list[str]
+    categories: list[str]
+    type: MediaType
+    data: dict[str, Any]
 
     def __init__(
         self,
@@ -147,14 +158,15 @@ class MediaMetadata:
         media_type: MediaType = MediaType.UNKNOWN,
         data: dict[str, Any] | None = None,
     ) -> None:
-        self._id = media_id
-        self._platform = platform
-        self._title = title
-        self._description = description
-        self._tags: list[str] = tags or []
-        self._categories: list[str] = categories or []
-        self._type = media_type
-        self._data = data or {}
+        # frozen, so the fields have to be set around the dataclass' __setattr__
+        object.__setattr__(self, "id", media_id)
+        object.__setattr__(self, "platform", platform)
+        object.__setattr__(self, "title", title)
+        object.__setattr__(self, "description", description)
+        object.__setattr__(self, "tags", tags or [])
+        object.__setattr__(self, "categories", categories or [])
+        object.__setattr__(self, "type", media_type)
+        object.__setattr__(self, "data", data or {})
 
     @classmethod
     def from_tweepy_status_model(cls, status: tweepy.models.Status) -> MediaMetadata:
@@ -197,42 +209,6 @@ class MediaMetadata:
             data=info,
         )
 
-    @property
-    def data(self) -> dict[str, Any]:
-        """
-        This can be any data from the source platform that you want to keep track of.
-        :return: The data dictionary. This is capable of being JSON serialized.
-        """
-        return self._data
-
-    @property
-    def id(self) -> Any:
-        return self._id
-
-    @property
-    def platform(self) -> Platform:
-        return self._platform
-
-    @property
-    def title(self) -> str | None:
-        return self._title
-
-    @property
-    def description(self) -> str | None:
-        return self._description
-
-    @property
-    def tags(self) -> list[str]:
-        return self._tags
-
-    @property
-    def categories(self) -> list[str]:
-        return self._categories
-
-    @property
-    def type(self) -> MediaType:
-        return self._type
-
     def __repr__(self) -> str:
         return f"<MediaMetadata id={self.id} platform={self.platform} title={self.title!r} description={self.description!r} tags={self.tags!r} categories={self.categories!r}>"
 
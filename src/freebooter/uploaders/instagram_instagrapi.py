@@ -18,7 +18,6 @@
 from __future__ import annotations
 
 import datetime
-import json
 import random
 import re
 import time
@@ -50,7 +49,7 @@ from requests.adapters import HTTPAdapter
 from urllib3 import Retry
 
 from .common import Uploader
-from .._assets import ASSETS
+from .._assets import DEVICES_ASSET, load_json_asset
 from ..file_management import ScratchFile
 from ..metadata import MediaMetadata, MediaType, Platform
 from ..middlewares import Middleware
@@ -137,12 +136,11 @@ class InstagrapiUploader(Uploader):
         insta_settings_nonnull.setdefault("country_code", 1)
 
         if "device_settings" not in insta_settings_nonnull:
-            with (ASSETS / "devices3.json").open("r") as fp:
-                devices: list[dict] = json.load(fp)
+            devices: list[dict] = load_json_asset(DEVICES_ASSET)
 
             device: dict = random.choice(devices)
 
-            insta_settings_nonnull["device_settings"] = device["fields"]
+            insta_settings_nonnull["device_settings"] = dict(device["fields"])  # the asset is cached and shared
 
         # time handling, which is "nice" in python
         if "timezone_offset" not in insta_settings_nonnull:
@@ -237,7 +235,11 @@ class InstagrapiUploader(Uploader):
         until_delta = unfreeze_at - time_now
         self.logger.warning(f'Freezing for "{reason}" until {unfreeze_at}! ({until_delta})')
         sleep_for_seconds = max(until_delta.total_seconds(), 0)  # can't be under 0
-        time.sleep(sleep_for_seconds)
+        if self._shutdown_event is not None:
+            # Freezes last hours to days, so this has to wake up if freebooter is shutting down
+            self._shutdown_event.wait(sleep_for_seconds)
+        else:
+            time.sleep(sleep_for_seconds)
 
         self._sleeping_until = None
 
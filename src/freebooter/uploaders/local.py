@@ -48,10 +48,9 @@ class LocalMediaStorage(Uploader):
         if not directory_path.is_absolute():
             directory_path = directory_path.absolute()
 
-        if not directory_path.exists():
-            directory_path.mkdir(parents=True)
-
-        if not directory_path.is_dir():
+        try:
+            directory_path.mkdir(parents=True, exist_ok=True)  # only raises if something else is in the way
+        except FileExistsError:
             raise ValueError(f"{directory_path} is not a directory!")
 
         self._directory = directory_path
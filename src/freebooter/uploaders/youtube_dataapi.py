@@ -17,18 +17,23 @@
 """
 from __future__ import annotations
 
+import random
 import typing
+from dataclasses import dataclass
 from difflib import get_close_matches
+from functools import lru_cache
 from io import IOBase
 from logging import getLogger
 from threading import Lock
-from traceback import format_exc
 from typing import ClassVar
 from typing import TYPE_CHECKING, cast
 from typing import TypedDict
 
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build, Resource
+from googleapiclient.discovery import build_from_document  # type: ignore[attr-defined]  # not in the stubs
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload, build_http
 from httplib2 import Http
@@ -49,13 +54,27 @@ if TYPE_CHECKING:
         VideoCategoryListResponse,
         VideoCategory,
     )
-    from googleapiclient._apis.youtube.v3.schemas import Video
+    from googleapiclient._apis.youtube.v3.schemas import Video, VideoStatus
 
 logger = getLogger(__name__)
 
 # Maximum number of times to retry before giving up.
 MAX_RETRIES = 10
 
+# Resumable uploads are sent in chunks of this size, so a video never has to be held in memory all at once and a
+# failed request only has to resend one chunk. googleapiclient requires a multiple of 256 KiB.
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MiB
+
+# googleapiclient's own retries are over in a few seconds, which is often not long enough for a rate limit to clear.
+# These throttling errors get a few more attempts with a longer, jittered exponential backoff on top of that.
+# quotaExceeded is not among them: the daily quota won't come back for hours, so retrying would only waste requests.
+THROTTLED_UPLOAD_ATTEMPTS = 3
+THROTTLED_STATUSES = frozenset((403, 429, 500, 503))
+THROTTLED_REASONS = ("rateLimitExceeded", "userRateLimitExceeded", "backendError")
+THROTTLED_BACKOFF_BASE = 4.0
+THROTTLED_BACKOFF_MAX = 120.0
+THROTTLED_BACKOFF_JITTER = 4.0
+
 # This OAuth 2.0 access scope allows an application to upload files to the
 # authenticated user's YouTube channel, but doesn't allow other types of access.
 YOUTUBE_UPLOAD_SCOPE = "https://www.googleapis.com/auth/youtube.upload"
@@ -64,6 +83,98 @@ YOUTUBE_API_VERSION = "v3"
 
 VALID_PRIVACY_STATUSES = ("public", "private", "unlisted")
 
+# The status of an upload never changes, so every insert body shares this one dict. It is only ever serialized.
+UPLOADED_VIDEO_STATUS: VideoStatus = {
+    "privacyStatus": "public",
+    "embeddable": True,
+    # https://developers.google.com/youtube/v3/docs/videos/insert
+    # can't make it public????? wtf???? thats bad
+    "selfDeclaredMadeForKids": False,
+}
+
+assert UPLOADED_VIDEO_STATUS["privacyStatus"] in VALID_PRIVACY_STATUSES, "Invalid privacy status."  # future use
+
+# The parts of the video resource that _build_body fills in
+UPLOADED_VIDEO_PARTS = "snippet,status"
+
+# Partial responses: only ask the API for the parts of the resources that we actually read
+VIDEO_CATEGORY_FIELDS = "items(id,snippet(title,assignable))"
+UPLOADED_VIDEO_FIELDS = "id,snippet(title,description,tags,categoryId)"
+
+
+@lru_cache(maxsize=None)
+def _youtube_discovery_document() -> str | None:
+    """
+    Reads the discovery document bundled with googleapiclient once, instead of once per build() call.
+    """
+    return get_static_doc(YOUTUBE_API_SERVICE_NAME, YOUTUBE_API_VERSION)
+
+
+def _build_youtube_resource(**kwargs) -> Resource:
+    document = _youtube_discovery_document()
+    if document is None:
+        # Not bundled with this version of googleapiclient, so let it fetch the document itself
+        return build(YOUTUBE_API_SERVICE_NAME, YOUTUBE_API_VERSION, **kwargs)
+    # The document is parsed again for every resource, since googleapiclient fills in the parsed copy as it builds
+    return build_from_document(document, **kwargs)
+
+
+def _is_throttled(http_error: HttpError) -> bool:
+    """
+    Returns True if the request failed because of a transient rate limit or backend error that is worth retrying.
+    """
+    if http_error.resp.status not in THROTTLED_STATUSES:
+        return False
+    content: str = http_error.content.decode("utf-8", "replace")
+    return "quotaExceeded" not in content and any(reason in content for reason in THROTTLED_REASONS)
+
+
+def _closest_match(query: str, choices: typing.Sequence[str]) -> str | None:
+    """
+    Returns the choice most similar to the query, or None if none of them are similar enough.
+    """
+    close_matches = get_close_matches(query, choices, n=1)
+    return close_matches[0] if close_matches else None
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryTable:
+    """
+    The video categories of a region, indexed both ways.
+    """
+
+    by_id: dict[int, str]  # ID -> title, all categories
+    by_name: dict[str, int]  # casefolded title -> ID, assignable categories only
+    choices: tuple[str, ...]  # the keys of by_name, for fuzzy matching
+
+    @classmethod
+    def from_categories(cls, categories: typing.Iterable[VideoCategory]) -> CategoryTable:
+        by_id: dict[int, str] = {}
+        by_name: dict[str, int] = {}
+
+        for category in categories:
+            category_id = int(category["id"])
+            category_title = category["snippet"]["title"]
+
+            by_id[category_id] = category_title
+            if category["snippet"]["assignable"]:  # we can't assign the others, so they can't be matched
+                by_name[category_title.casefold()] = category_id
+
+        return cls(by_id=by_id, by_name=by_name, choices=tuple(by_name))
+
+    def id_by_name(self, category_name: str) -> int | None:
+        """
+        Returns the ID of the category with the given name, or of the closest matching one.
+        """
+        category_name = category_name.casefold()
+
+        exact_match = self.by_name.get(category_name)
+        if exact_match is not None:
+            return exact_match  # the common case, since most metadata comes from YouTube itself
+
+        closest_match = _closest_match(category_name, self.choices)
+        return self.by_name[closest_match] if closest_match is not None else None
+
 
 class ClientSecretSet(TypedDict):
     client_id: str
@@ -111,85 +222,59 @@ class YouTubeDataAPIV3Uploader(Uploader):
 
         self._youtube_oauth_resource: YouTubeResource = cast(
             "YoutubeResource",  # type: ignore  # breaks mypy
-            build(  # type: ignore
-                YOUTUBE_API_SERVICE_NAME,
-                YOUTUBE_API_VERSION,
-                credentials=self._credentials,
-                http=self._http_handler,
+            _build_youtube_resource(
+                # build() won't take both credentials and an http, so the credentials have to wrap the http
+                http=AuthorizedHttp(self._credentials, http=self._http_handler),
             ),
         )
         self._youtube_dev_key_resource: YouTubeResource = cast(
             "YoutubeResource",  # type: ignore  # breaks mypy
-            build(  # type: ignore
-                YOUTUBE_API_SERVICE_NAME,
-                YOUTUBE_API_VERSION,
+            _build_youtube_resource(
                 developerKey=youtube_api_key,
                 http=self._http_handler,
             ),
         )
 
+        # The category list is effectively static, so it is fetched once and shared by every upload
+        self._category_table: CategoryTable | None = None
+        self._video_categories_lock = Lock()
+
     def close(self) -> None:
         super().close()
         self._http_handler.close()
         del self._credentials  # does not close?
 
+    def _load_categories(self) -> CategoryTable:
+        """
+        Returns the video categories for the US region, fetching them from the API on the first call only.
+        """
+        with self._video_categories_lock:
+            if self._category_table is None:
+                video_categories_resource: YouTubeResource.VideoCategoriesResource = (
+                    self._youtube_dev_key_resource.videoCategories()
+                )
+                video_categories_http_request: VideoCategoryListResponseHttpRequest = video_categories_resource.list(
+                    regionCode="US", part="snippet", fields=VIDEO_CATEGORY_FIELDS
+                )
+                video_category_list_response: VideoCategoryListResponse = video_categories_http_request.execute(
+                    num_retries=MAX_RETRIES
+                )
+                self._category_table = CategoryTable.from_categories(video_category_list_response["items"])
+
+            return self._category_table
+
     def _get_category_id_by_name(self, category_name: str) -> int:
         """
         Returns the closest matching category ID for the given category name.
         :param category_name: The name of the category to get the ID for.
         :return: Category ID, or 22 (People & Blogs) if no match is found.
         """
-        video_categories_resource: YouTubeResource.VideoCategoriesResource = (
-            self._youtube_dev_key_resource.videoCategories()
-        )
-        video_categories_http_request: VideoCategoryListResponseHttpRequest = video_categories_resource.list(
-            regionCode="US", part="snippet"
-        )
-        video_category_list_response: VideoCategoryListResponse = video_categories_http_request.execute(
-            num_retries=MAX_RETRIES
-        )
-        category_list: list[VideoCategory] = video_category_list_response["items"]
+        category_id = self._load_categories().id_by_name(category_name)
 
-        safe_categories: dict[str, int] = {}
-
-        for category in category_list:
-            if category["snippet"]["assignable"]:
-                category_id = int(category["id"])
-                category_title = category["snippet"]["title"]
-
-                safe_categories[category_title] = category_id
-            else:
-                continue  # we can't assign it, so we might as well skip it
-
-        close_matches: list[int] = [
-            safe_categories[str(match)] for match in get_close_matches(category_name, safe_categories.keys())
-        ]
-
-        if len(close_matches) == 0:
-            return 22  # we tried
-        else:
-            return close_matches[0]
+        return category_id if category_id is not None else 22  # we tried
 
     def _get_category_name_by_id(self, category_id: int) -> str | None:
-        video_categories_resource: YouTubeResource.VideoCategoriesResource = (
-            self._youtube_dev_key_resource.videoCategories()
-        )
-        video_categories_http_request: VideoCategoryListResponseHttpRequest = video_categories_resource.list(
-            regionCode="US", part="snippet"
-        )
-        video_category_list_response: VideoCategoryListResponse = video_categories_http_request.execute(
-            num_retries=MAX_RETRIES
-        )
-        category_list: list[VideoCategory] = video_category_list_response["items"]
-
-        for category in category_list:
-            category_id_from_list: int = int(category["id"])
-            category_title_from_list: str = category["snippet"]["title"]
-
-            if category_id_from_list == category_id:
-                return category_title_from_list
-        else:
-            return None
+        return self._load_categories().by_id.get(category_id)
 
     def _build_body(self, metadata: MediaMetadata) -> Video:
         category_name: str = metadata.categories[0]
@@ -202,17 +287,9 @@ class YouTubeDataAPIV3Uploader(Uploader):
                 "tags": metadata.tags,
                 "categoryId": str(category_id),
             },
-            "status": {
-                "privacyStatus": "public",
-                "embeddable": True,
-                # https://developers.google.com/youtube/v3/docs/videos/insert
-                # can't make it public????? wtf???? thats bad
-                "selfDeclaredMadeForKids": False,
-            },
+            "status": UPLOADED_VIDEO_STATUS,
         }
 
-        assert body["status"]["privacyStatus"] in VALID_PRIVACY_STATUSES, "Invalid privacy status."  # future use
-
         return body
 
     @typing.no_type_check  # mypy gets the list comp VERY wrong
@@ -223,18 +300,49 @@ class YouTubeDataAPIV3Uploader(Uploader):
             if uploaded[1] is not None
         ]
 
+    def _next_chunk(self, insert_request: VideoHttpRequest) -> tuple[typing.Any, Video | None]:
+        """
+        Calls next_chunk on the insert request, backing off and retrying if YouTube is throttling the upload.
+        The request is resumable, so a retry picks up from where the failed attempt left off.
+        """
+        assert self._shutdown_event is not None, "Uploader is not ready!"
+
+        attempt = 0
+        while True:
+            try:
+                return insert_request.next_chunk(num_retries=MAX_RETRIES)
+            except HttpError as http_error:
+                attempt += 1
+                if attempt >= THROTTLED_UPLOAD_ATTEMPTS or not _is_throttled(http_error):
+                    raise
+
+                backoff = min(THROTTLED_BACKOFF_MAX, THROTTLED_BACKOFF_BASE * 2**attempt)
+                backoff += random.uniform(0, THROTTLED_BACKOFF_JITTER)
+                logger.warning(
+                    f"YouTube is throttling uploads (HTTP {http_error.resp.status}), "
+                    f"retrying in {backoff:.1f} seconds. (attempt {attempt} of {THROTTLED_UPLOAD_ATTEMPTS})"
+                )
+                if self._shutdown_event.wait(backoff):
+                    raise  # shutting down, don't keep the upload going
+
     def _upload_one(self, file: ScratchFile, metadata: MediaMetadata) -> MediaMetadata | None:
-        media_file_upload: MediaFileUpload = MediaFileUpload(str(file.path), chunksize=-1, resumable=True)
+        media_file_upload: MediaFileUpload = MediaFileUpload(
+            str(file.path), chunksize=UPLOAD_CHUNK_SIZE, resumable=True
+        )
         try:
             videos_resource: YouTubeResource.VideosResource = self._youtube_oauth_resource.videos()
 
             body: Video = self._build_body(metadata)
 
             insert_request: VideoHttpRequest = videos_resource.insert(
-                part=",".join(body.keys()), body=body, media_body=media_file_upload
+                part=UPLOADED_VIDEO_PARTS, body=body, media_body=media_file_upload, fields=UPLOADED_VIDEO_FIELDS
             )
 
-            status, response = insert_request.next_chunk(num_retries=MAX_RETRIES)  # type: None, Video
+            response: Video | None = None
+            while response is None:
+                status, response = self._next_chunk(insert_request)
+                if status is not None:
+                    logger.debug(f"Uploading video from {metadata.id} to YouTube: {status.progress():.0%}")
 
             logger.info(
                 f"Successfully uploaded a YouTube video with ID {response['id']} "
@@ -254,8 +362,7 @@ class YouTubeDataAPIV3Uploader(Uploader):
                 media_type=MediaType.VIDEO,
             )
         except HttpError as http_error:
-            logger.error(f"An HTTP error {http_error.resp.status} occurred:\n{http_error.content}")
-            logger.exception(format_exc())
+            logger.exception(f"An HTTP error {http_error.resp.status} occurred:\n{http_error.content}")
             return None
         finally:
             media_stream: IOBase = cast("IOBase", media_file_upload.stream())
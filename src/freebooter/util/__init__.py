@@ -20,3 +20,5 @@ from __future__ import annotations
 from .frozen_dict import *
 from .loader import *
 from .weaklist import *
+from .schema import *
+from .fastjson import *
@@ -0,0 +1,45 @@
+"""
+    freebooter downloads photos & videos from the internet and uploads it onto your social media accounts.
+    Copyright (C) 2023 Parker Wahle
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+from logging import getLogger
+from typing import Any
+
+logger = getLogger(__name__)
+
+try:
+    import orjson  # type: ignore
+
+    def json_loads(data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+    def json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:
+    logger.debug("orjson not found, falling back to the json module")
+    import json
+
+    def json_loads(data: bytes | str) -> Any:
+        return json.loads(data)
+
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+
+__all__ = ("json_loads", "json_dumps")
@@ -34,6 +34,14 @@ class FrozenDict(Mapping):
     def __getitem__(self, key):
         return self._d[key]
 
+    # Mapping implements these on top of __getitem__ with a try/except, so hand them straight to the dict instead
+
+    def __contains__(self, key):
+        return key in self._d
+
+    def get(self, key, default=None):
+        return self._d.get(key, default)
+
     def __hash__(self):
         # It would have been simpler and maybe more obvious to
         # use hash(tuple(sorted(self._d.iteritems()))) from this discussion
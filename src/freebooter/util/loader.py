@@ -11,14 +11,21 @@
 
     THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
-import json
 import os
 from typing import Any, IO
 
 import yaml
 
+from .fastjson import json_loads
 
-class Loader(yaml.SafeLoader):
+try:
+    # libyaml's parser is an order of magnitude faster than the pure-Python one, and behaves the same
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader  # type: ignore
+
+
+class Loader(_SafeLoader):
     """YAML Loader with `!include` constructor."""
 
     def __init__(self, stream: IO) -> None:
@@ -38,11 +45,14 @@ def construct_include(loader: Loader, node: yaml.Node) -> Any:
     filename = os.path.abspath(os.path.join(loader._root, loader.construct_scalar(node)))  # type: ignore
     extension = os.path.splitext(filename)[1].lstrip(".")
 
+    if extension in ("json",):
+        # Included JSON files are small secrets & tokens, so read them in one go and parse with the fastest parser
+        with open(filename, "rb") as bf:
+            return json_loads(bf.read())
+
     with open(filename, "r") as f:
         if extension in ("yaml", "yml"):
             return yaml.load(f, Loader)
-        elif extension in ("json",):
-            return json.load(f)
         else:
             return "".join(f.readlines())
 
@@ -0,0 +1,44 @@
+"""
+    freebooter downloads photos & videos from the internet and uploads it onto your social media accounts.
+    Copyright (C) 2023 Parker Wahle
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+from logging import getLogger
+from typing import Any, Callable
+
+import jsonschema
+
+logger = getLogger(__name__)
+
+SchemaValidator = Callable[[Any], Any]
+
+
+def compile_schema(schema: dict[str, Any]) -> SchemaValidator:
+    """
+    Compiles a JSON schema into a reusable validator.
+    The returned callable raises jsonschema.ValidationError if the instance passed to it is invalid.
+    Building the validator (and resolving its $refs) is the expensive part of validation, so do it once per schema.
+    """
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema).validate
+
+
+__all__ = (
+    "SchemaValidator",
+    "compile_schema",
+)
@@ -28,7 +28,7 @@ from os import sep
 from pathlib import Path
 from threading import Event, Lock
 from threading import Thread
-from typing import Any, cast, ClassVar
+from typing import Any, cast, ClassVar, Iterable
 
 from mariadb import ConnectionPool, Connection, Cursor
 
@@ -40,6 +40,9 @@ from ..types import UploadCallback
 
 logger = getLogger(__name__)
 
+# Keeps IN (...) lists in are_handled well under max_allowed_packet, even for channels with thousands of videos
+MAX_IDS_PER_QUERY = 1000
+
 # I don't trust yt-dlp to be backwards compatible with youtube_dl *perfectly*, so I'm going to try to import yt-dlp
 # first, and for any errors, I'll fall back to youtube_dl.
 try:
@@ -152,6 +155,32 @@ class Watcher(metaclass=ABCMeta):
             connection.commit()
             self.logger.debug(f"Marked {id_} as handled: {is_handled}")
 
+    def mark_handled_many(self, ids: Iterable[Any], is_handled: bool = True) -> None:
+        """
+        Marks all the given IDs as handled in the database with a single batch and a single commit
+        :param ids: The IDs to mark as handled
+        :param is_handled: Whether the IDs are handled
+        :return:
+        """
+        assert self.ready, "Watcher is not ready!"
+        assert self._mariadb_pool is not None, "Watcher is not ready!"
+
+        rows = [(id_, is_handled) for id_ in ids]
+
+        if not rows:
+            return
+
+        with self._mariadb_pool.get_connection() as connection, connection.cursor() as cursor:  # type: Connection, Cursor
+            cursor.executemany(
+                f"""
+                INSERT INTO `{self._table_name}` (id, handled) VALUES (%s, %s)
+                    ON DUPLICATE KEY UPDATE handled = VALUES(handled);
+                """,
+                rows,
+            )
+            connection.commit()
+            self.logger.debug(f"Marked {len(rows)} IDs as handled: {is_handled}")
+
     def is_handled(self, id_: Any) -> bool:
         """
         Checks if the given ID is handled
@@ -171,6 +200,36 @@ class Watcher(metaclass=ABCMeta):
             self.logger.debug(f"Result of is_handled: {result}")
             return result is not None and result[0]
 
+    def are_handled(self, ids: Iterable[Any]) -> set[Any]:
+        """
+        Checks which of the given IDs are handled, in as few queries as possible.
+        :param ids: The IDs to check
+        :return: The subset of the IDs that are handled
+        """
+        assert self.ready, "Watcher is not ready!"
+        assert self._mariadb_pool is not None, "Watcher is not ready!"
+
+        ids = list(ids)
+        handled: set[Any] = set()
+
+        if not ids:
+            return handled  # "IN ()" is a syntax error
+
+        with self._mariadb_pool.get_connection() as connection, connection.cursor() as cursor:  # type: Connection, Cursor
+            for start in range(0, len(ids), MAX_IDS_PER_QUERY):
+                chunk = ids[start : start + MAX_IDS_PER_QUERY]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(
+                    f"""
+                    SELECT id FROM `{self._table_name}` WHERE handled = TRUE AND id IN ({placeholders});
+                    """,
+                    tuple(chunk),
+                )
+                handled.update(row[0] for row in cursor.fetchall())
+
+        self.logger.debug(f"{len(handled)} of {len(ids)} IDs are handled")
+        return handled
+
     def make_tables(self) -> None:
         """
         Initializes the tables for the watcher.
@@ -212,8 +271,7 @@ class Watcher(metaclass=ABCMeta):
             except TimeoutError:
                 result = None
 
-            for _, metadata in downloaded:
-                self.mark_handled(metadata.id)
+            self.mark_handled_many(metadata.id for _, metadata in downloaded)
 
             if result is None:
                 self.logger.error(f"{self.name} upload callback failed!")
@@ -17,6 +17,7 @@
 """
 from __future__ import annotations
 
+import os
 from pathlib import Path
 from shutil import copyfile
 from typing import Generator
@@ -47,10 +48,9 @@ class LocalMediaLoader(ThreadWatcher):
         if not directory_path.is_absolute():
             directory_path = directory_path.absolute()
 
-        if not directory_path.exists():
-            directory_path.mkdir(parents=True)
-
-        if not directory_path.is_dir():
+        try:
+            directory_path.mkdir(parents=True, exist_ok=True)  # only raises if something else is in the way
+        except FileExistsError:
             raise ValueError(f"{directory_path} is not a directory!")
 
         self._directory = directory_path
@@ -63,13 +63,22 @@ class LocalMediaLoader(ThreadWatcher):
         assert self._file_manager is not None, "File manager not set!"
         assert folder.is_dir(), f"{folder} is not a directory!"
 
-        for file in folder.iterdir():
-            if file.is_dir():
-                yield from self._check_in_folder(file, handle_if_already_handled=handle_if_already_handled)
-            elif file.name != ".DS_Store":  # macos ong
-                if not handle_if_already_handled and self.is_handled(file.name):
+        # scandir's DirEntry caches the file type from the directory listing, so this doesn't stat every file
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    yield from self._check_in_folder(
+                        Path(entry.path), handle_if_already_handled=handle_if_already_handled
+                    )
+                    continue
+                if entry.name == ".DS_Store":  # macos ong
                     continue
 
+                if not handle_if_already_handled and self.is_handled(entry.name):
+                    continue
+
+                file = Path(entry.path)
+
                 scratch_file = self._file_manager.get_file(file_extension=file.suffix)
 
                 copyfile(file, scratch_file.path)
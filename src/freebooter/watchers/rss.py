@@ -70,13 +70,13 @@ class RSSWatcher(YTDLThreadWatcher):
         Chooses the best RSSWatcher for the given configuration. This will be a subclass of RSSWatcher.
         """
         url = config["url"]
-        platform = Platform.from_url(url)
+        try:
+            platform = Platform.from_url(url)
+        except ValueError:
+            platform = Platform.UNKNOWN  # most feeds aren't from a platform we know about, and that's fine
 
-        match platform:
-            case Platform.REDDIT:
-                return RedditWatcher(name, preprocessors, **config)
-            case _:
-                return cls(name, preprocessors, **config)
+        watcher_cls = PLATFORM_RSS_WATCHERS.get(platform, cls)
+        return watcher_cls(name, preprocessors, **config)
 
     def close(self) -> None:
         super().close()
@@ -203,4 +203,9 @@ class RedditWatcher(RSSWatcher):
         return link_parent.attrs.get("href")
 
 
+# Register platform-specific RSSWatchers here so choose_best_watcher can find them
+PLATFORM_RSS_WATCHERS: dict[Platform, type[RSSWatcher]] = {
+    Platform.REDDIT: RedditWatcher,
+}
+
 __all__ = ("RSSWatcher",)
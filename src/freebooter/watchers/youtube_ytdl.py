@@ -17,8 +17,8 @@
 """
 from __future__ import annotations
 
+import re
 from logging import getLogger
-from traceback import format_exc
 from typing import Generator
 
 from .common import YTDLThreadWatcher
@@ -28,6 +28,9 @@ from ..middlewares import Middleware
 
 logger = getLogger(__name__)
 
+# "UC" followed by the 22 base64url characters of the channel's ID
+_CHANNEL_ID_RE = re.compile(r"UC[A-Za-z0-9_-]{22}")
+
 
 class YTDLYouTubeChannelWatcher(YTDLThreadWatcher):
     """
@@ -54,8 +57,11 @@ class YTDLYouTubeChannelWatcher(YTDLThreadWatcher):
         :param ytdl_params: Parameters to pass to youtube-dl
         """
 
-        if not (channel_id.startswith("UC") and len(channel_id) == 24):
-            raise ValueError("Invalid channel ID. Channel ID must start with UC and be 24 characters long")
+        if _CHANNEL_ID_RE.fullmatch(channel_id) is None:
+            raise ValueError(
+                f"Invalid channel ID {channel_id!r}. Channel ID must start with UC and be followed by 22 letters, "
+                f"digits, dashes or underscores"
+            )
 
         super().__init__(
             name,
@@ -95,7 +101,6 @@ class YTDLYouTubeChannelWatcher(YTDLThreadWatcher):
                 return scratch_file, metadata
             except Exception as e:
                 self.logger.exception(f"Error downloading video {video_id}: {e}")
-                self.logger.exception(format_exc())
                 return None
 
     def check_for_uploads(self) -> list[tuple[ScratchFile, MediaMetadata]]:
@@ -143,8 +148,14 @@ class YTDLYouTubeChannelWatcher(YTDLThreadWatcher):
             if self._backtrack:
                 video_list: list[dict] = list(videos)
                 video_list.reverse()  # get the oldest videos first
+
+                # One query for the whole channel instead of one per video
+                handled_ids = set() if self._copy else self.are_handled(video["id"] for video in video_list)
+
                 for video in video_list:
-                    prepared = self._prepare_video(video["id"], self._copy)
+                    if video["id"] in handled_ids:
+                        continue
+                    prepared = self._prepare_video(video["id"], handle_if_already_handled=True)
                     if prepared is not None:
                         ready_prepared.append(prepared)
             else:
@@ -156,7 +167,6 @@ class YTDLYouTubeChannelWatcher(YTDLThreadWatcher):
             return ready_prepared
         except Exception as e:
             logger.exception(f"Error checking for uploads: {e}")
-            logger.exception(format_exc())
             return []
 
 